@@ -5,12 +5,31 @@ needing to know how to open csv data or how to index into a dict/list.
 """
 
 import os
+import sys
 import functools
-import csv
+import pickle
+from typing import Any, NamedTuple, Sequence
+import numpy as np
 
 _ATTRIBUTES_CSV_FILE_NAME = "pokemon_attributes.csv"
 _EFFECTIVENESS_CSV_FILE_NAME = "type_effectiveness.csv"
 
+# Parsed contents of both csv files are cached here so that later imports can skip
+# parsing (and importing pandas) until one of the csv files or this file changes
+_CSV_CACHE_FILE_NAME = _ATTRIBUTES_CSV_FILE_NAME + ".pkl"
+
+# Stored alongside the cached data. Increment whenever the shape of what
+# _read_csv_files returns changes so that caches written by older versions are ignored
+_CSV_CACHE_VERSION = 1
+
+
+# Every name, type, and attribute string loaded from the csv files is interned.
+# Callers that look up the same name repeatedly can intern it once with intern_name
+# so that dict lookups match by identity instead of comparing string contents.
+intern_name = sys.intern
+
+# How many results each single-Pokemon getter remembers
+_GETTER_CACHE_SIZE = 2048
 
 _CSV_NOT_FOUND_MSG_FORMAT = """We expected to find a file named
 {} in the same folder containing your notebook, but it doees not
@@ -26,35 +45,210 @@ if not os.path.isfile(_EFFECTIVENESS_CSV_FILE_NAME):
     )
 
 
-_pokemon: dict[str, dict[str, int]] = {}
-_effectiveness: dict[str, dict[str, float]] = {}
-_integer_attributes = ["Attack", "Defense", "HP", "Sp. Atk", "Sp. Def", "Speed"]
+class PokemonRecord(NamedTuple):
+    """All the attributes of a single Pokemon"""
+
+    name: str
+    region: str
+    type1: str
+    type2: str
+    hp: int
+    attack: int
+    defense: int
+    sp_atk: int
+    sp_def: int
+    speed: int
+
+
+# The csv column holding each PokemonRecord field, in field order
+_RECORD_HEADERS = (
+    "Name",
+    "Region",
+    "Type 1",
+    "Type 2",
+    "HP",
+    "Attack",
+    "Defense",
+    "Sp. Atk",
+    "Sp. Def",
+    "Speed",
+)
+
+_integer_attributes = frozenset(
+    ["Attack", "Defense", "HP", "Sp. Atk", "Sp. Def", "Speed"]
+)
+
+# Parsing every column straight into its final type lets pandas' C parser do the
+# casting instead of a Python loop over every cell
+_ATTRIBUTES_DTYPES = {
+    header: np.int32 if header in _integer_attributes else str
+    for header in _RECORD_HEADERS
+}
+
+
+def _read_csv_files() -> tuple[dict[str, Any], list[str], np.ndarray]:
+    """Parses both csv files
+
+    Returns:
+        attributes_columns: Maps each attributes header to the values in its column,
+            as an int32 array for integer attributes and a list of str otherwise
+        attacking_types: The type names in the order used by the matrix
+        eff_matrix: (n_types, n_types) float32 matrix of the effectiveness of the
+            attacker type against the defender type, indexed by [attacker, defender]
+    """
+
+    # pandas is slow to import and only needed when the cache is out of date
+    import pandas as pd
 
-with open(_ATTRIBUTES_CSV_FILE_NAME, encoding="utf-8") as f:
-    raw_pkmn_data = list(csv.reader(f))
-attributes_headers = raw_pkmn_data[0]
-attributes_rows = raw_pkmn_data[1:]
-for attribute_row in attributes_rows:
-    pkmn = {}
-    for i, attributes_header in enumerate(attributes_headers):
-        if attributes_header in _integer_attributes:
-            pkmn[attributes_headers[i]] = int(attribute_row[i])
-        else:
-            pkmn[attributes_headers[i]] = attribute_row[i]
-    _pokemon[pkmn["Name"]] = pkmn
+    attributes_df = pd.read_csv(
+        _ATTRIBUTES_CSV_FILE_NAME,
+        dtype=_ATTRIBUTES_DTYPES,
+        keep_default_na=False,
+        encoding="utf-8",
+    )
+    attributes_columns = {
+        header: (
+            attributes_df[header].to_numpy()
+            if header in _integer_attributes
+            else attributes_df[header].tolist()
+        )
+        for header in attributes_df.columns
+    }
+
+    # Rows of the effectiveness csv are defending types and columns are attacking types
+    effectiveness_df = pd.read_csv(
+        _EFFECTIVENESS_CSV_FILE_NAME,
+        index_col=0,
+        keep_default_na=False,
+        encoding="utf-8",
+    )
+    attacking_types = effectiveness_df.columns.tolist()
+    eff_matrix = np.ascontiguousarray(
+        effectiveness_df.loc[attacking_types, attacking_types]
+        .to_numpy(dtype=np.float32)
+        .T
+    )
 
+    return attributes_columns, attacking_types, eff_matrix
 
-with open(_EFFECTIVENESS_CSV_FILE_NAME, encoding="utf-8") as f:
-    raw_type_data = list(csv.reader(f))
-attacking_types = raw_type_data[0][1:]
-defending_effectiveness_rows = raw_type_data[1:]
-for attacking_type in attacking_types:
-    _effectiveness[attacking_type] = {}
-for defending_effectiveness_row in defending_effectiveness_rows:
-    defending_type = defending_effectiveness_row[0]
-    for i, effectiveness in enumerate(defending_effectiveness_row[1:]):
-        attacking_type = attacking_types[i]
-        _effectiveness[attacking_type][defending_type] = float(effectiveness)
+
+def _load_csv_files() -> tuple[dict[str, Any], list[str], np.ndarray]:
+    """Returns the result of _read_csv_files, using the pickle cache when possible
+
+    The cache is used if it is newer than both csv files and this file, was written
+    with the current _CSV_CACHE_VERSION, and holds data of the expected shape.
+    Otherwise the csv files are parsed and the cache is rewritten. Failing to read
+    or write the cache is never an error since it can always be rebuilt from the
+    csv files.
+    """
+
+    source_mtime = max(
+        os.path.getmtime(_ATTRIBUTES_CSV_FILE_NAME),
+        os.path.getmtime(_EFFECTIVENESS_CSV_FILE_NAME),
+        os.path.getmtime(__file__),
+    )
+    if (
+        os.path.isfile(_CSV_CACHE_FILE_NAME)
+        and os.path.getmtime(_CSV_CACHE_FILE_NAME) > source_mtime
+    ):
+        try:
+            with open(_CSV_CACHE_FILE_NAME, "rb") as f:
+                cache_version, csv_data = pickle.load(f)
+            if cache_version == _CSV_CACHE_VERSION and _is_valid_csv_data(csv_data):
+                return csv_data
+        except Exception:
+            pass
+
+    csv_data = _read_csv_files()
+    try:
+        with open(_CSV_CACHE_FILE_NAME, "wb") as f:
+            pickle.dump((_CSV_CACHE_VERSION, csv_data), f)
+    except OSError:
+        pass
+    return csv_data
+
+
+def _is_valid_csv_data(csv_data: Any) -> bool:
+    """Whether csv_data has the shape that _read_csv_files returns"""
+
+    if not isinstance(csv_data, tuple) or len(csv_data) != 3:
+        return False
+    attributes_columns, attacking_types, eff_matrix = csv_data
+
+    if not isinstance(attributes_columns, dict) or not all(
+        header in attributes_columns for header in _RECORD_HEADERS
+    ):
+        return False
+    num_pokemon = len(attributes_columns["Name"])
+    for header, column in attributes_columns.items():
+        if header in _integer_attributes:
+            if not isinstance(column, np.ndarray) or column.dtype != np.int32:
+                return False
+        elif not isinstance(column, list) or not all(
+            isinstance(value, str) for value in column
+        ):
+            return False
+        if len(column) != num_pokemon:
+            return False
+
+    if not isinstance(attacking_types, list) or not all(
+        isinstance(attacking_type, str) for attacking_type in attacking_types
+    ):
+        return False
+    num_types = len(attacking_types)
+    return (
+        isinstance(eff_matrix, np.ndarray)
+        and eff_matrix.dtype == np.float32
+        and eff_matrix.shape == (num_types, num_types)
+    )
+
+
+# Pokemon attributes are stored as a Struct-of-Arrays: one column per attribute,
+# all indexed by the row number that _name_to_idx maps each Pokemon's name to
+_attributes_columns, _attacking_types, _eff_matrix = _load_csv_files()
+_attributes_headers: list[str] = [sys.intern(header) for header in _attributes_columns]
+_int_cols: dict[str, np.ndarray] = {
+    header: _attributes_columns[header] for header in _integer_attributes
+}
+_str_cols: dict[str, list[str]] = {
+    header: [sys.intern(value) for value in _attributes_columns[header]]
+    for header in _attributes_headers
+    if header not in _integer_attributes
+}
+_name_to_idx: dict[str, int] = {name: i for i, name in enumerate(_str_cols["Name"])}
+
+_attack = _int_cols["Attack"]
+_defense = _int_cols["Defense"]
+_hp = _int_cols["HP"]
+_sp_atk = _int_cols["Sp. Atk"]
+_sp_def = _int_cols["Sp. Def"]
+_speed = _int_cols["Speed"]
+
+# Single Pokemon lookups read from one record instead of indexing into every column
+_pokemon: dict[str, PokemonRecord] = {
+    record.name: record
+    for record in map(
+        PokemonRecord._make,
+        zip(
+            *(
+                _int_cols[header].tolist() if header in _int_cols else _str_cols[header]
+                for header in _RECORD_HEADERS
+            )
+        ),
+    )
+}
+
+# Type effectiveness is stored as a (n_types, n_types) matrix indexed by
+# [attacker, defender] using the indices from _type_idx
+_type_idx: dict[str, int] = {
+    sys.intern(attacking_type): i for i, attacking_type in enumerate(_attacking_types)
+}
+
+# The loaded columns now live in the structures above
+del _attributes_columns, _attacking_types
+
+# The _type_idx index of each Pokemon's primary type, aligned with the stat columns
+_type1_idx = np.array([_type_idx[t] for t in _str_cols["Type 1"]], dtype=np.intp)
 
 
 def handle_key_error(func):
@@ -79,66 +273,129 @@ def handle_key_error(func):
 def print_attributes(pkmn_name: str) -> None:
     """Prints all the attributes for a Pokemon"""
 
-    for attribute in _pokemon[pkmn_name]:
-        print(attribute, ": ", _pokemon[pkmn_name][attribute])
+    # Build the whole output first so that it is written with a single print call
+    idx = _name_to_idx[pkmn_name]
+    lines = []
+    for attribute in _attributes_headers:
+        if attribute in _int_cols:
+            value = int(_int_cols[attribute][idx])
+        else:
+            value = _str_cols[attribute][idx]
+        lines.append(f"{attribute} :  {value}")
+    print("\n".join(lines))
+
+
+@handle_key_error
+def get_record(pkmn_name: str) -> PokemonRecord:
+    """All of the Pokemon's attributes, accessible by name like record.hp"""
+
+    return _pokemon[pkmn_name]
 
 
 @handle_key_error
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_region(pkmn_name: str) -> str:
     """Where the Pokemon was first discovered"""
 
-    return _pokemon[pkmn_name]["Region"]
+    return _pokemon[pkmn_name].region
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_type1(pkmn_name: str) -> str:
     """The Pokemon's primary type"""
 
-    return _pokemon[pkmn_name]["Type 1"]
+    return _pokemon[pkmn_name].type1
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_type2(pkmn_name: str) -> str:
     """The Pokemon's secondary type"""
 
-    return _pokemon[pkmn_name]["Type 2"]
+    return _pokemon[pkmn_name].type2
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_hp(pkmn_name: str) -> int:
     """The Pokemon's amount of Hit Points, HP for short"""
 
-    return _pokemon[pkmn_name]["HP"]
+    return _pokemon[pkmn_name].hp
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_attack(pkmn_name: str) -> int:
     """The Pokemon's attack stat, affects how much physical damage a Pokemon can do"""
 
-    return _pokemon[pkmn_name]["Attack"]
+    return _pokemon[pkmn_name].attack
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_defense(pkmn_name: str) -> int:
     """The Pokemon's defense stat, affects how much physical damage a Pokemon can take before fainting"""
 
-    return _pokemon[pkmn_name]["Defense"]
+    return _pokemon[pkmn_name].defense
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_special_attack(pkmn_name: str) -> int:
     """The Pokemon's special attack stat, affects how much special damage a Pokemon can do"""
 
-    return _pokemon[pkmn_name]["Sp. Atk"]
+    return _pokemon[pkmn_name].sp_atk
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_special_defense(pkmn_name: str) -> int:
     """The Pokemon's special defense stat, affects how much special damage a Pokemon can take before fainting"""
 
-    return _pokemon[pkmn_name]["Sp. Def"]
+    return _pokemon[pkmn_name].sp_def
 
 
+@functools.lru_cache(maxsize=_GETTER_CACHE_SIZE)
 def get_speed(pkmn_name: str) -> int:
     """The Pokemon's speed stat, determines which Pokemon can attack first in a battle"""
 
-    return _pokemon[pkmn_name]["Speed"]
+    return _pokemon[pkmn_name].speed
 
 
+def get_stats_bulk(pkmn_names: Sequence[str]) -> dict[str, np.ndarray]:
+    """The integer stats of many Pokemon at once
+
+    Returns a dict mapping "hp", "attack", "defense", "sp_atk", "sp_def", and
+    "speed" to int32 arrays whose i-th entry is the stat of pkmn_names[i]. Each
+    array is built with a single gather, which is much faster than calling the
+    individual getters in a loop.
+    """
+
+    idx = np.fromiter(
+        (_name_to_idx[pkmn_name] for pkmn_name in pkmn_names),
+        dtype=np.int64,
+        count=len(pkmn_names),
+    )
+    return {
+        "hp": _hp[idx],
+        "attack": _attack[idx],
+        "defense": _defense[idx],
+        "sp_atk": _sp_atk[idx],
+        "sp_def": _sp_def[idx],
+        "speed": _speed[idx],
+    }
+
+
+@functools.lru_cache(maxsize=len(_type_idx) ** 2)
 def get_type_effectiveness(attacker_type: str, defender_type: str) -> float:
     """The effectiveness of attacker's type against defender's type"""
 
-    return _effectiveness[attacker_type][defender_type]
+    return float(_eff_matrix[_type_idx[attacker_type], _type_idx[defender_type]])
+
+
+def get_type_effectiveness_vec(
+    attacker_types: Sequence[str], defender_types: Sequence[str]
+) -> np.ndarray:
+    """The effectiveness of each attacker type against the defender type at the same position
+
+    Looks up every pair with a single fancy-indexing call into the effectiveness
+    matrix, which is much faster than calling get_type_effectiveness in a loop.
+    """
+
+    attacker_idx = np.array([_type_idx[t] for t in attacker_types], dtype=np.intp)
+    defender_idx = np.array([_type_idx[t] for t in defender_types], dtype=np.intp)
+    return _eff_matrix[attacker_idx, defender_idx]
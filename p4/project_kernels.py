@@ -0,0 +1,80 @@
+"""
+Compiled kernels for battle simulations that pit whole rosters of Pokemon
+against each other. They operate on the Struct-of-Arrays stat columns and the
+type effectiveness matrix loaded by project.py rather than calling its getters
+once per Pokemon.
+
+The kernels are compiled with Numba when it is installed. Without Numba they
+still work, but run as plain Python loops.
+"""
+
+from typing import Sequence
+import numpy as np
+import project
+
+try:
+    from numba import njit
+except ImportError:
+
+    def njit(*args, **kwargs):
+        """Stands in for numba.njit when Numba is not installed by not compiling"""
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit(cache=True, fastmath=True)
+def simulate(atk_idx, def_idx, atk_stat, def_stat, eff_mat, type_a, type_d):
+    """Damage dealt by each attacker to the defender at the same position
+
+    Parameters:
+        atk_idx: Row index of each attacking Pokemon in the stat columns
+        def_idx: Row index of each defending Pokemon, same length as atk_idx
+        atk_stat: Attack stat column, indexed by atk_idx
+        def_stat: Defense stat column, indexed by def_idx
+        eff_mat: Type effectiveness matrix indexed by [attacker type, defender type]
+        type_a: Type index column of the attackers, indexed by atk_idx
+        type_d: Type index column of the defenders, indexed by def_idx
+
+    Returns:
+        float32 array where entry k is
+        atk_stat[atk_idx[k]] * effectiveness // def_stat[def_idx[k]]
+    """
+
+    dmg = np.empty(atk_idx.shape[0], dtype=np.float32)
+    for k in range(atk_idx.shape[0]):
+        a = atk_idx[k]
+        d = def_idx[k]
+        dmg[k] = atk_stat[a] * eff_mat[type_a[a], type_d[d]] // def_stat[d]
+    return dmg
+
+
+def roster_damage(
+    attacker_names: Sequence[str], defender_names: Sequence[str]
+) -> np.ndarray:
+    """Damage every attacker deals to every defender using their primary types
+
+    Returns a float32 array of shape (len(attacker_names), len(defender_names))
+    whose [i, j] entry is the damage attacker_names[i] deals to defender_names[j].
+    """
+
+    attackers = np.array(
+        [project._name_to_idx[name] for name in attacker_names], dtype=np.intp
+    )
+    defenders = np.array(
+        [project._name_to_idx[name] for name in defender_names], dtype=np.intp
+    )
+    atk_idx = np.repeat(attackers, len(defenders))
+    def_idx = np.tile(defenders, len(attackers))
+    dmg = simulate(
+        atk_idx,
+        def_idx,
+        project._attack,
+        project._defense,
+        project._eff_matrix,
+        project._type1_idx,
+        project._type1_idx,
+    )
+    return dmg.reshape(len(attackers), len(defenders))
@@ -5,6 +5,7 @@ modifying global variables or taking too long.
 """
 
 import builtins
+import signal
 import threading
 import sys
 import os
@@ -14,8 +15,11 @@ from contextlib import contextmanager
 # SHARED with master_grader
 CODE_MAX_EXECUTION_TIME = 2  # in seconds
 
+# SIGALRM is only available on Unix. Elsewhere we fall back to threading.Timer
+_CAN_USE_SIGALRM = hasattr(signal, "SIGALRM")
 
-def timeout_handler() -> None:
+
+def timeout_handler(*args) -> None:
     """Helper function for execute_code to trigger when code has taken too long
 
     SHARED with master_grader.
@@ -49,36 +53,56 @@ def execute_code(
             if desired message is f"Test case failed: {e}", then prefix is "Test case failed: "
     """
 
-    before_exec_globals = global_vars.copy()
-    builtin_identifiers = dir(builtins)
-
-    timer = threading.Timer(CODE_MAX_EXECUTION_TIME, timeout_handler)
-    timer.start()
+    # Snapshot object identities rather than copying values so that detecting
+    # changes never triggers (possibly expensive or ambiguous) equality comparisons.
+    # This is the only O(number of globals) pass made before exec.
+    before_exec_ids = {var: id(value) for var, value in global_vars.items()}
 
     try:
-        exec(code, global_vars)
+        with _time_limit(CODE_MAX_EXECUTION_TIME):
+            exec(code, global_vars)
     except Exception as e:
         errors_list.append(f"{error_prefix}{e}")
-    finally:
-        timer.cancel()  # code finished before alarm went off, cancel the alarm
 
-    after_exec_globals = global_vars.copy()
-
-    for var in before_exec_globals:
-        if (
-            var in before_exec_globals
-            and before_exec_globals[var] != after_exec_globals[var]
-        ):
+    for var, before_id in before_exec_ids.items():
+        if var not in global_vars or id(global_vars[var]) != before_id:
             warnings_list.append(f"Global variable '{var}' was modified.")
 
-    variables_defined_by_exec = set(after_exec_globals) - set(before_exec_globals)
+    variables_defined_by_exec = global_vars.keys() - before_exec_ids.keys()
     for var_name in variables_defined_by_exec:
-        if var_name in builtin_identifiers:
+        if var_name in builtins.__dict__:
             warnings_list.append(
                 f"Built-in function '{var_name}' was modified. You should never overwrite these."
             )
 
 
+@contextmanager
+def _time_limit(seconds: float):
+    """Calls timeout_handler if the code inside the context runs longer than seconds
+
+    Uses a SIGALRM timer when possible, which interrupts the running code on the
+    main thread without needing to start a new thread. Signal handlers can only be
+    set from the main thread, so threading.Timer is used everywhere else.
+    """
+
+    if _CAN_USE_SIGALRM and threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGALRM, timeout_handler)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            # code finished before alarm went off, cancel the alarm
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    else:
+        timer = threading.Timer(seconds, timeout_handler)
+        timer.start()
+        try:
+            yield
+        finally:
+            timer.cancel()  # code finished before alarm went off, cancel the alarm
+
+
 @contextmanager
 def suppress_output():
     """Temporarily suppresses stdout and stderr output.
@@ -7,9 +7,21 @@ file to inform grader.check about test cases to run
 """
 
 import os
+import re
 import ast
-from typing import List, Dict, Any, Optional
-import nbformat
+import pickle
+import types
+import io
+import contextlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, FrozenSet, Optional, Tuple
+
+# Modules that are slow to import or only needed by some code paths (like nbformat,
+# or concurrent.futures for the autograder) are imported inside the functions that
+# use them instead of here, so importing the grader stays fast. Python caches
+# imported modules, so only the first call pays.
+if TYPE_CHECKING:
+    import nbformat
 from student_grader.grader_messages import (
     FAILED_FIND_QID_IN_METADATA_FORMAT,
     CHECK_START_FORMAT,
@@ -42,6 +54,14 @@ from student_grader.notebook_layout import (
 # SHARED with master_grader
 POINTS_POSSIBLE_PREFIX = "Points possible"
 
+# Finds the q_id passed to each student_grader.check call in a cell
+_CHECK_CALL_RE = re.compile(r'student_grader\.check\("([^"]+)"\)')
+
+# Maps each q_id to the inputs of the last requirements check run for it and the
+# warnings and errors that check produced. Re-running a check on an unchanged
+# notebook reuses them instead of running the requirements check again.
+_last_check_cache: Dict[str, Tuple[Tuple, List[str], List[str]]] = {}
+
 
 def check(
     q_id: str, is_running_from_autograder: bool = False, overwrite_student_nb_path=""
@@ -88,8 +108,8 @@ def check(
         student_nb_path = overwrite_student_nb_path
     else:
         student_nb_path = get_nb_path()
-    with open(student_nb_path, "r", encoding="utf-8") as f:
-        notebook = nbformat.read(f, as_version=4)
+    student_nb_mtime = os.path.getmtime(student_nb_path)
+    notebook = _load_nb(student_nb_path, student_nb_mtime)
     dir_path = os.path.dirname(student_nb_path)
 
     # Load the assignment metadata and check that q_id is present in it
@@ -103,19 +123,15 @@ def check(
     errors_in_previous_cells = []
     warnings_in_previous_cells = []
     did_check_pass = False
+    qid_index, runnable_cells = _index_notebook(student_nb_path, student_nb_mtime)
+    question_block_idx = qid_index.get(q_id)
 
     # Execute the cells up until grader check
-    for i, cell in enumerate(notebook.cells[:-CHECK_CELL_OFFSET_STUDENT]):
-
-        found_question_block = cell.source.startswith(POINTS_POSSIBLE_PREFIX)
-        found_current_question_block = (
-            found_question_block
-            and f'student_grader.check("{q_id}")'
-            in notebook.cells[i + CHECK_CELL_OFFSET_STUDENT].source
-        )
+    for i in range(len(notebook.cells) - CHECK_CELL_OFFSET_STUDENT):
+        cell = notebook.cells[i]
 
         # Check that all question blocks are properly formatted in the student notebook
-        if found_current_question_block:
+        if i == question_block_idx:
 
             # Get text of cells below the points possible cell for the current question block
             student_code = notebook.cells[i + CODE_CELL_OFFSET_STUDENT].source
@@ -156,7 +172,9 @@ def check(
             required_functions = assignment_metadata[q_id][METADATA_REQUIRED_FUNCS_KEY]
             required_vars = assignment_metadata[q_id][METADATA_REQUIRED_VARS_KEY]
             assertions = assignment_metadata[q_id][METADATA_ASSERTIONS_KEY]
-            _check_student_code_against_requirements(
+            _check_requirements_unless_unchanged(
+                q_id,
+                (student_nb_path, student_nb_mtime),
                 student_code,
                 required_functions,
                 required_vars,
@@ -187,7 +205,7 @@ def check(
         # question, execute it with suppressed output so its output does not appear
         # under the grader.check cell. grader.check
         # cells are skipped in order to avoid recursively calling grader.check
-        elif cell.cell_type == "code" and "grader.check" not in cell.source:
+        elif i in runnable_cells:
             with suppress_output():
                 execute_code(
                     cell.source,
@@ -202,6 +220,49 @@ def check(
         return did_check_pass
 
 
+def run_all_checks(
+    q_ids: List[str], overwrite_student_nb_path: str = ""
+) -> Dict[str, bool]:
+    """Runs check for every q_id in parallel, one worker process per CPU core
+
+    Meant for the autograder, so each check runs with is_running_from_autograder
+    enabled. The output printed by each check is collected in its worker and
+    printed here in the order of q_ids so that checks don't interleave their output.
+
+    Parameters:
+        q_ids: The identifiers for the questions to check, like ["q1", "q2"]
+        overwrite_student_nb_path: Optional path to the student notebook. Defaults to
+            the path given to initialize, which worker processes do not inherit on
+            platforms that spawn rather than fork them.
+
+    Returns:
+        Dictionary mapping each q_id to whether its check passed
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    student_nb_path = overwrite_student_nb_path or get_nb_path()
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(
+            executor.map(_check_in_subprocess, q_ids, [student_nb_path] * len(q_ids))
+        )
+
+    did_checks_pass = {}
+    for q_id, (did_check_pass, output) in zip(q_ids, results):
+        print(output, end="")
+        did_checks_pass[q_id] = did_check_pass
+    return did_checks_pass
+
+
+def _check_in_subprocess(q_id: str, student_nb_path: str) -> Tuple[bool, str]:
+    """Worker for run_all_checks that returns the check result and its output"""
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        did_check_pass = check(q_id, True, student_nb_path)
+    return did_check_pass, output.getvalue()
+
+
 def _check_student_code_against_requirements(
     student_code: str,
     required_functions: List[str],
@@ -223,8 +284,10 @@ def _check_student_code_against_requirements(
     functions in grader packages. SHARED with master_grader.
     """
 
+    # Parse the student code once and check every required function against it
+    used_names = _collect_names(student_code)
     for function_name in required_functions:
-        if not _does_code_use(student_code, function_name):
+        if function_name not in used_names:
             current_question_errors.append(MISSED_REQ_FUNC_FORMAT.format(function_name))
 
     for required_var in required_vars:
@@ -240,6 +303,110 @@ def _check_student_code_against_requirements(
     )
 
 
+def _check_requirements_unless_unchanged(
+    q_id: str,
+    nb_version: Tuple[str, float],
+    student_code: str,
+    required_functions: List[str],
+    required_vars: List[str],
+    assertions: str,
+    current_question_warnings: List[str],
+    current_question_errors: List[str],
+    global_vars: Dict[str, Any],
+) -> None:
+    """Calls _check_student_code_against_requirements unless the result is known
+
+    If the last requirements check for q_id ran on the same notebook version
+    (path and mtime) with the same student code and requirements, and against
+    global variables with the same values, its warnings and errors are appended
+    again instead of re-running the check. Executing the notebook is not always
+    deterministic (random numbers, the time, files), so the cached result is only
+    used when every global variable can be fingerprinted by value. Otherwise the
+    check always runs.
+    """
+
+    globals_fingerprint = _fingerprint_global_vars(global_vars)
+    if globals_fingerprint is None:
+        _check_student_code_against_requirements(
+            student_code,
+            required_functions,
+            required_vars,
+            assertions,
+            current_question_warnings,
+            current_question_errors,
+            global_vars,
+        )
+        _last_check_cache.pop(q_id, None)
+        return
+
+    check_inputs = (
+        nb_version,
+        student_code,
+        tuple(required_functions),
+        tuple(required_vars),
+        assertions,
+        tuple(current_question_warnings),
+        tuple(current_question_errors),
+        globals_fingerprint,
+    )
+    cached_check = _last_check_cache.get(q_id)
+    if cached_check is not None and cached_check[0] == check_inputs:
+        current_question_warnings.extend(cached_check[1])
+        current_question_errors.extend(cached_check[2])
+        return
+
+    num_prior_warnings = len(current_question_warnings)
+    num_prior_errors = len(current_question_errors)
+    _check_student_code_against_requirements(
+        student_code,
+        required_functions,
+        required_vars,
+        assertions,
+        current_question_warnings,
+        current_question_errors,
+        global_vars,
+    )
+    _last_check_cache[q_id] = (
+        check_inputs,
+        current_question_warnings[num_prior_warnings:],
+        current_question_errors[num_prior_errors:],
+    )
+
+
+def _fingerprint_global_vars(global_vars: Dict[str, Any]) -> Optional[Tuple]:
+    """Summarizes the values of global variables so that equal states compare equal
+
+    Modules are identified by name and plain functions by their code and defaults.
+    Every other value is pickled. Returns None if any value cannot be fingerprinted,
+    for example classes and closures defined by notebook code or generators.
+    """
+
+    fingerprint = []
+    for var in sorted(global_vars):
+        if var == "__builtins__":
+            continue
+        value = global_vars[var]
+        try:
+            if isinstance(value, types.ModuleType):
+                fingerprint.append((var, value.__name__))
+            elif isinstance(value, types.FunctionType):
+                if value.__closure__ is not None:
+                    return None
+                fingerprint.append(
+                    (
+                        var,
+                        value.__code__,
+                        pickle.dumps(value.__defaults__),
+                        pickle.dumps(value.__kwdefaults__),
+                    )
+                )
+            else:
+                fingerprint.append((var, pickle.dumps(value)))
+        except Exception:
+            return None
+    return tuple(fingerprint)
+
+
 def _print_feedback_student(
     warnings_arr: List[str],
     errors_arr: List[str],
@@ -275,42 +442,100 @@ def _does_code_use(code_snippet: str, name: str) -> bool:
         name: The name of the function or ast operator to look for in the code snippet
     """
 
-    class CustomNodeVisitor(ast.NodeVisitor):
-        """Extends ast's NoteVisitor to look for functions or operators"""
-
-        def __init__(self):
-            self.found = False
-
-        def visit(self, node):
-            """Traverse the abstract syntax tree to check for the function call or operator"""
-
-            if isinstance(node, ast.Call):
-                full_name = self.get_full_name(node.func)
-                if full_name == name:
-                    self.found = True
-            elif (
-                isinstance(node, ast.BinOp)
-                or isinstance(node, ast.BoolOp)
-                or isinstance(node, ast.UnaryOp)
-            ):
-                op_name = node.op.__class__.__name__
-                if op_name == name:
-                    self.found = True
-            self.generic_visit(node)
-
-        def get_full_name(self, node):
-            """Recursively retrieves the full name of a function being called
-
-            This inclues attribute accesses (e.g., "module.function").
-            """
-
-            if isinstance(node, ast.Attribute):
-                return self.get_full_name(node.value) + "." + node.attr
-            elif isinstance(node, ast.Name):
-                return node.id
-            return ""
+    return name in _collect_names(code_snippet)
+
+
+class _CustomNodeVisitor(ast.NodeVisitor):
+    """Extends ast's NoteVisitor to collect functions and operators"""
+
+    def __init__(self):
+        self.names = set()
+
+    def visit(self, node):
+        """Traverse the abstract syntax tree to record function calls and operators"""
+
+        if isinstance(node, ast.Call):
+            self.names.add(self.get_full_name(node.func))
+        elif (
+            isinstance(node, ast.BinOp)
+            or isinstance(node, ast.BoolOp)
+            or isinstance(node, ast.UnaryOp)
+        ):
+            self.names.add(node.op.__class__.__name__)
+        self.generic_visit(node)
+
+    def get_full_name(self, node):
+        """Recursively retrieves the full name of a function being called
+
+        This inclues attribute accesses (e.g., "module.function").
+        """
+
+        if isinstance(node, ast.Attribute):
+            return self.get_full_name(node.value) + "." + node.attr
+        elif isinstance(node, ast.Name):
+            return node.id
+        return ""
+
+
+@lru_cache(maxsize=128)
+def _collect_names(code_snippet: str) -> frozenset:
+    """Uses ast to find the names of all functions called and operators used in code
+
+    Function names include attribute accesses (e.g., "module.function") and operator
+    names are the names of their ast classes (e.g., "Add"). The result is cached so
+    that checking many names against the same code only parses it once.
+
+    Parameters:
+        code_snippet: A string containing Python code to be analyzed
+    """
 
     tree = ast.parse(code_snippet)
-    visitor = CustomNodeVisitor()
+    visitor = _CustomNodeVisitor()
     visitor.visit(tree)
-    return visitor.found
+    return frozenset(visitor.names)
+
+
+@lru_cache(maxsize=4)
+def _load_nb(nb_path: str, nb_mtime: float) -> "nbformat.NotebookNode":
+    """Reads and parses the notebook at nb_path
+
+    The modification time is part of the cache key so that the notebook is only
+    re-parsed after the student saves it again.
+    """
+
+    import nbformat
+
+    with open(nb_path, "r", encoding="utf-8") as f:
+        return nbformat.read(f, as_version=4)
+
+
+@lru_cache(maxsize=4)
+def _index_notebook(
+    nb_path: str, nb_mtime: float
+) -> Tuple[Dict[str, int], FrozenSet[int]]:
+    """Finds the question blocks and runnable code cells of the notebook in one pass
+
+    Scanning once per notebook means each check can jump straight to its question
+    block and decide which cells to run without re-testing any cell's source.
+    Cached under the same key as _load_nb since notebook objects are not hashable.
+
+    Returns:
+        qid_index: Maps each q_id to the index of its points possible cell. A points
+            possible cell starts a question block for every q_id passed to
+            student_grader.check in the cell CHECK_CELL_OFFSET_STUDENT cells below
+            it. Only the first block for each q_id is used.
+        runnable_cells: Indices of the code cells that are not grader.check cells
+    """
+
+    notebook = _load_nb(nb_path, nb_mtime)
+    qid_index = {}
+    runnable_cells = set()
+    for i, cell in enumerate(notebook.cells):
+        if cell.cell_type == "code" and "grader.check" not in cell.source:
+            runnable_cells.add(i)
+        elif i >= CHECK_CELL_OFFSET_STUDENT and notebook.cells[
+            i - CHECK_CELL_OFFSET_STUDENT
+        ].source.startswith(POINTS_POSSIBLE_PREFIX):
+            for match in _CHECK_CALL_RE.finditer(cell.source):
+                qid_index.setdefault(match.group(1), i - CHECK_CELL_OFFSET_STUDENT)
+    return qid_index, frozenset(runnable_cells)